@@ -10,6 +10,9 @@ from PIL import Image, ImageDraw, ImageFont
 import argparse
 
 class MCQSheetGenerator:
+    # Rendered blank sheets shared across instances, keyed by every layout setting (see layout_key)
+    _sheet_cache = {}
+    
     def __init__(self, width=2480, height=3508):  # A4 at 300 DPI
         self.width = width
         self.height = height
@@ -18,27 +21,31 @@ class MCQSheetGenerator:
         self.circle_radius = 38  # 150% bigger (25 * 1.5 = 37.5, rounded to 38)
         self.question_spacing = 90  # Increased from 60 to 90 for better spacing
         self.option_spacing = 120
+        self._tiles = {}  # Pre-rendered circle-with-letter tiles, keyed by (letter, circle_radius, font)
+        self._bbox_cache = {}  # Text (width, height), keyed by (text, font)
+        self._fonts = None  # (large, medium, small), loaded once so cache keys stay stable
         
-    def create_corner_markers(self, draw):
+    def create_corner_markers(self, sheet):
         """Create L-shaped corner markers for sheet detection"""
         marker_thickness = 15
         marker_length = self.corner_size
+        right = self.width - 50
+        bottom = self.height - 50
         
-        # Top-left corner
-        draw.rectangle([50, 50, 50 + marker_length, 50 + marker_thickness], fill='black')
-        draw.rectangle([50, 50, 50 + marker_thickness, 50 + marker_length], fill='black')
-        
-        # Top-right corner
-        draw.rectangle([self.width - 50 - marker_length, 50, self.width - 50, 50 + marker_thickness], fill='black')
-        draw.rectangle([self.width - 50 - marker_thickness, 50, self.width - 50, 50 + marker_length], fill='black')
-        
-        # Bottom-left corner
-        draw.rectangle([50, self.height - 50 - marker_thickness, 50 + marker_length, self.height - 50], fill='black')
-        draw.rectangle([50, self.height - 50 - marker_length, 50 + marker_thickness, self.height - 50], fill='black')
+        L, T = marker_length, marker_thickness
         
-        # Bottom-right corner
-        draw.rectangle([self.width - 50 - marker_length, self.height - 50 - marker_thickness, self.width - 50, self.height - 50], fill='black')
-        draw.rectangle([self.width - 50 - marker_thickness, self.height - 50 - marker_length, self.width - 50, self.height - 50], fill='black')
+        # Each L is a single six-point polygon, drawn together in one call
+        markers = [
+            # Top-left corner
+            [(50, 50), (50 + L, 50), (50 + L, 50 + T), (50 + T, 50 + T), (50 + T, 50 + L), (50, 50 + L)],
+            # Top-right corner
+            [(right, 50), (right - L, 50), (right - L, 50 + T), (right - T, 50 + T), (right - T, 50 + L), (right, 50 + L)],
+            # Bottom-left corner
+            [(50, bottom), (50 + L, bottom), (50 + L, bottom - T), (50 + T, bottom - T), (50 + T, bottom - L), (50, bottom - L)],
+            # Bottom-right corner
+            [(right, bottom), (right - L, bottom), (right - L, bottom - T), (right - T, bottom - T), (right - T, bottom - L), (right, bottom - L)],
+        ]
+        cv2.fillPoly(sheet, [np.array(marker, np.int32) for marker in markers], (0, 0, 0))
     
     def create_header(self, draw, font_large, font_medium):
         """Create the header section with title and student info"""
@@ -55,55 +62,80 @@ class MCQSheetGenerator:
         for i, field in enumerate(fields):
             draw.text((self.margin, y_start + i * 50), field, fill='black', font=font_medium)
     
-    def create_mcq_grid(self, draw, font_medium, num_questions=50, options_per_question=4):
-        """Create the MCQ answer grid"""
+    def _bbox(self, draw, text, font):
+        """Return the (width, height) of text, measuring each string only once"""
+        key = (text, font)
+        size = self._bbox_cache.get(key)
+        if size is None:
+            bbox = draw.textbbox((0, 0), text, font=font)
+            size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+            self._bbox_cache[key] = size
+        return size
+    
+    def render_option_tile(self, letter, font_medium):
+        """Render a single answer circle with its letter, cached per letter"""
+        key = (letter, self.circle_radius, font_medium)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            return tile
+        
+        r = self.circle_radius
+        tile_img = Image.new('RGB', (2 * r + 1, 2 * r + 1), 'white')
+        tile_draw = ImageDraw.Draw(tile_img)
+        tile_draw.ellipse([0, 0, 2 * r, 2 * r], outline='black', width=3)
+        
+        # Center the letter inside the circle
+        letter_width, letter_height = self._bbox(tile_draw, letter, font_medium)
+        tile_draw.text((r - letter_width // 2, r - letter_height // 2), letter, fill='black', font=font_medium)
+        
+        tile = np.array(tile_img)
+        self._tiles[key] = tile
+        return tile
+    
+    def question_origins(self, num_questions):
+        """Top-left (x, y) of every question row, as NumPy arrays"""
         start_y = 450
         questions_per_column = 25
         column_width = (self.width - 2 * self.margin) // 2
         
-        option_letters = ['A', 'B', 'C', 'D', 'E'][:options_per_question]
-        
-        for q in range(num_questions):
-            # Determine column and position
-            column = q // questions_per_column
-            row_in_column = q % questions_per_column
-            
-            x_base = self.margin + column * column_width
-            y_pos = start_y + row_in_column * self.question_spacing
-            
-            # Question number - aligned with circle centers
-            q_num = str(q + 1).zfill(2)
+        q = np.arange(num_questions)
+        x_base = self.margin + (q // questions_per_column) * column_width
+        y_pos = start_y + (q % questions_per_column) * self.question_spacing
+        return x_base, y_pos
+    
+    def create_mcq_grid(self, sheet, font_medium, num_questions=50, options_per_question=4):
+        """Stamp the MCQ answer circles into the sheet buffer"""
+        option_letters = ('A', 'B', 'C', 'D', 'E')[:options_per_question]
+        x_offsets = tuple(60 + i * self.option_spacing for i in range(options_per_question))
+        x_base, y_pos = self.question_origins(num_questions)
+        rows = y_pos.tolist()
+        
+        # Every circle for a given letter is identical, so render it once and
+        # copy it into place for each question
+        for i, letter in enumerate(option_letters):
+            tile = self.render_option_tile(letter, font_medium)
+            tile_h, tile_w = tile.shape[:2]
+            xs = (x_base + x_offsets[i]).tolist()
+            for x, y in zip(xs, rows):
+                # Clip to the page, as drawing directly would, and darken rather
+                # than overwrite so overlapping circles and markers stay visible
+                h = min(tile_h, self.height - y)
+                w = min(tile_w, self.width - x)
+                if h > 0 and w > 0:
+                    region = sheet[y:y + h, x:x + w]
+                    np.minimum(region, tile[:h, :w], out=region)
+    
+    def create_question_numbers(self, draw, font_medium, num_questions=50):
+        """Label each question row, aligned with the circle centers"""
+        x_base, y_pos = self.question_origins(num_questions)
+        q_num_str = [f"{q + 1:02d}." for q in range(num_questions)]
+        r = self.circle_radius
+        
+        for q_num, x, y in zip(q_num_str, x_base.tolist(), y_pos.tolist()):
             # Calculate text height to center it with the circles
-            text_bbox = draw.textbbox((0, 0), f"{q_num}.", font=font_medium)
-            text_height = text_bbox[3] - text_bbox[1]
-            question_y = y_pos + self.circle_radius - text_height // 2
-            draw.text((x_base, question_y), f"{q_num}.", fill='black', font=font_medium)
-            
-            # Answer options
-            for i, letter in enumerate(option_letters):
-                option_x = x_base + 60 + i * self.option_spacing
-                
-                # Draw circle for answer - centered at option_x
-                circle_center_x = option_x + self.circle_radius
-                circle_center_y = y_pos + self.circle_radius
-                
-                draw.ellipse([
-                    circle_center_x - self.circle_radius,
-                    circle_center_y - self.circle_radius,
-                    circle_center_x + self.circle_radius,
-                    circle_center_y + self.circle_radius
-                ], outline='black', width=3)
-                
-                # Draw letter centered inside the circle
-                letter_bbox = draw.textbbox((0, 0), letter, font=font_medium)
-                letter_width = letter_bbox[2] - letter_bbox[0]
-                letter_height = letter_bbox[3] - letter_bbox[1]
-                
-                # Center the letter inside the circle
-                letter_x = circle_center_x - letter_width // 2
-                letter_y = circle_center_y - letter_height // 2
-                
-                draw.text((letter_x, letter_y), letter, fill='black', font=font_medium)
+            _, text_height = self._bbox(draw, q_num, font_medium)
+            question_y = y + r - text_height // 2
+            draw.text((x, question_y), q_num, fill='black', font=font_medium)
     
     def create_instructions(self, draw, font_small):
         """Add instructions at the bottom"""
@@ -119,30 +151,56 @@ class MCQSheetGenerator:
         for i, instruction in enumerate(instructions):
             draw.text((self.margin, start_y + i * 25), instruction, fill='black', font=font_small)
     
-    def generate_sheet(self, num_questions=50, options_per_question=4, output_path="mcq_answer_sheet.png"):
-        """Generate the complete MCQ answer sheet"""
-        # Create image
-        img = Image.new('RGB', (self.width, self.height), 'white')
-        draw = ImageDraw.Draw(img)
+    def load_fonts(self):
+        """Load the (large, medium, small) fonts once per generator"""
+        if self._fonts is None:
+            # Try to load fonts, fall back to default if not available
+            try:
+                self._fonts = (ImageFont.truetype("arial.ttf", 48),
+                               ImageFont.truetype("arial.ttf", 32),
+                               ImageFont.truetype("arial.ttf", 24))
+            except:
+                self._fonts = (ImageFont.load_default(), ImageFont.load_default(), ImageFont.load_default())
+        return self._fonts
+    
+    def render_sheet(self, num_questions=50, options_per_question=4):
+        """Render the complete MCQ answer sheet as a PIL image"""
+        font_large, font_medium, font_small = self.load_fonts()
         
-        # Try to load fonts, fall back to default if not available
-        try:
-            font_large = ImageFont.truetype("arial.ttf", 48)
-            font_medium = ImageFont.truetype("arial.ttf", 32)
-            font_small = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_small = ImageFont.load_default()
+        # Stamp the markers and answer circles into a raw buffer, then draw text on top
+        sheet = np.full((self.height, self.width, 3), 255, np.uint8)
+        self.create_corner_markers(sheet)
+        self.create_mcq_grid(sheet, font_medium, num_questions, options_per_question)
+        
+        img = Image.fromarray(sheet)
+        draw = ImageDraw.Draw(img)
         
         # Create sheet components
-        self.create_corner_markers(draw)
         self.create_header(draw, font_large, font_medium)
-        self.create_mcq_grid(draw, font_medium, num_questions, options_per_question)
+        self.create_question_numbers(draw, font_medium, num_questions)
         self.create_instructions(draw, font_small)
+        return img
+    
+    def layout_key(self, num_questions=50, options_per_question=4):
+        """Everything that determines how a blank sheet renders"""
+        return (self.width, self.height, self.margin, self.corner_size, self.circle_radius,
+                self.question_spacing, self.option_spacing, num_questions, options_per_question)
+    
+    def generate_sheet(self, num_questions=50, options_per_question=4, output_path="mcq_answer_sheet.png",
+                       fast_write=False):
+        """Generate the complete MCQ answer sheet"""
+        # Identical layouts render identically, so only draw each one once
+        key = self.layout_key(num_questions, options_per_question)
+        if key not in self._sheet_cache:
+            self._sheet_cache[key] = self.render_sheet(num_questions, options_per_question)
+        img = self._sheet_cache[key].copy()
         
         # Save the image
-        img.save(output_path, dpi=(300, 300))
+        if fast_write:
+            # Quicker, larger PNG for intermediate/test sheets
+            img.save(output_path, dpi=(300, 300), compress_level=1, optimize=False)
+        else:
+            img.save(output_path, dpi=(300, 300))
         print(f"MCQ answer sheet saved as: {output_path}")
         return img
 
@@ -151,11 +209,12 @@ def main():
     parser.add_argument('--questions', type=int, default=50, help='Number of questions (default: 50)')
     parser.add_argument('--options', type=int, default=4, help='Options per question (default: 4)')
     parser.add_argument('--output', type=str, default='mcq_answer_sheet.png', help='Output filename')
+    parser.add_argument('--fast-write', action='store_true', help='Use fast, low PNG compression (larger file)')
     
     args = parser.parse_args()
     
     generator = MCQSheetGenerator()
-    generator.generate_sheet(args.questions, args.options, args.output)
+    generator.generate_sheet(args.questions, args.options, args.output, fast_write=args.fast_write)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,132 +6,232 @@ Automatically fills in a blank MCQ answer sheet with random answers for testing
 
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw
 import argparse
-import random
 import json
+import os
+import functools
+from collections import namedtuple
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard json module
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # Optional, falls back to NumPy stamping
+    njit = None
+
+# Circle centers as a [question, option, (x, y)] array, the shared radius, and the option letters
+TemplateArrays = namedtuple('TemplateArrays', ['centers', 'radius', 'letters'])
+
+def save_json(path, data):
+    """Write data to path as indented JSON, using orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+if njit is not None:
+    @njit(cache=True)
+    def _stamp_noise_dots_jit(arr, marks, seed):
+        """Compiled stamping of the noise dots for every (center_x, center_y, fill_value, radius) row"""
+        np.random.seed(seed)
+        for i in range(marks.shape[0]):
+            center_x, center_y, fill_value, radius = marks[i, 0], marks[i, 1], marks[i, 2], marks[i, 3]
+            for _ in range(np.random.randint(5, 16)):
+                dot_x = center_x + np.random.randint(-radius // 2, radius // 2 + 1)
+                dot_y = center_y + np.random.randint(-radius // 2, radius // 2 + 1)
+                dot_size = np.random.randint(1, 4)
+                shade = max(0, fill_value - np.random.randint(10, 31))
+                for dy in range(-dot_size, dot_size + 1):
+                    y = dot_y + dy
+                    if y < 0 or y >= arr.shape[0]:  # Clip to the sheet
+                        continue
+                    for dx in range(-dot_size, dot_size + 1):
+                        x = dot_x + dx
+                        if x < 0 or x >= arr.shape[1]:
+                            continue
+                        if dx * dx + dy * dy <= dot_size * dot_size:
+                            arr[y, x, :] = shade
+else:
+    _stamp_noise_dots_jit = None
+
+@functools.lru_cache(maxsize=4)
+def _decode_blank(path, mtime):
+    """Decode a blank sheet once per (path, mtime); callers must copy before drawing"""
+    return cv2.imread(path)
 
 class MCQAutoFiller:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
         self.circle_radius = 38
         self.question_spacing = 90
         self.option_spacing = 120
         self.margin = 200
+        self._templates = {}  # TemplateArrays, keyed by (num_questions, options_per_question)
+        self._gray_lut = tuple((v, v, v) for v in range(256))  # Shared BGR gray colors
+        
+        # Pixel offsets covering a disk of each noise-dot size
+        self._dot_offsets = {}
+        for size in (1, 2, 3):
+            yy, xx = np.mgrid[-size:size + 1, -size:size + 1]
+            disk = xx * xx + yy * yy <= size * size
+            self._dot_offsets[size] = (yy[disk], xx[disk])
         
     def create_answer_template(self, num_questions=50, options_per_question=4):
         """Create a template with circle positions matching the generator"""
-        template = {}
         start_y = 450
         questions_per_column = 25
         column_width = (2480 - 2 * self.margin) // 2
         
-        option_letters = ['A', 'B', 'C', 'D', 'E'][:options_per_question]
+        option_letters = ('A', 'B', 'C', 'D', 'E')[:options_per_question]
         
-        for q in range(num_questions):
-            # Determine column and position
-            column = q // questions_per_column
-            row_in_column = q % questions_per_column
-            
-            x_base = self.margin + column * column_width
-            y_pos = start_y + row_in_column * self.question_spacing
-            
-            question_num = q + 1
-            template[question_num] = {}
-            
-            # Calculate circle positions for each option
-            for i, letter in enumerate(option_letters):
-                option_x = x_base + 60 + i * self.option_spacing
-                
-                circle_center_x = option_x + self.circle_radius
-                circle_center_y = y_pos + self.circle_radius
-                
-                template[question_num][letter] = {
-                    'center': (circle_center_x, circle_center_y),
-                    'radius': self.circle_radius
-                }
+        # Determine column and position of every question at once
+        q = np.arange(num_questions)
+        x_base = self.margin + (q // questions_per_column) * column_width
+        y_pos = start_y + (q % questions_per_column) * self.question_spacing
+        
+        r = self.circle_radius
+        x_offsets = 60 + np.arange(options_per_question) * self.option_spacing
+        
+        # Circle centers indexed [question, option, (x, y)]
+        centers = np.empty((num_questions, options_per_question, 2), dtype=int)
+        centers[:, :, 0] = x_base[:, None] + x_offsets + r
+        centers[:, :, 1] = y_pos[:, None] + r
         
-        return template
+        return TemplateArrays(centers=centers, radius=r, letters=option_letters)
+    
+    def _get_template(self, num_questions=50, options_per_question=4):
+        """Return the answer template, built once per layout"""
+        key = (num_questions, options_per_question)
+        if key not in self._templates:
+            self._templates[key] = self.create_answer_template(num_questions, options_per_question)
+        return self._templates[key]
     
     def generate_random_answers(self, num_questions=50, options_per_question=4, 
                               skip_probability=0.1, answer_key=None):
-        """Generate random answers for the MCQ sheet"""
-        option_letters = ['A', 'B', 'C', 'D', 'E'][:options_per_question]
-        answers = {}
+        """Generate random answers as an int8 array of option indices (-1 = skipped)"""
+        option_letters = ('A', 'B', 'C', 'D', 'E')[:options_per_question]
         
-        for q in range(1, num_questions + 1):
-            # Sometimes skip questions (simulate incomplete answers)
-            if random.random() < skip_probability:
-                answers[q] = None
-            elif answer_key and str(q) in answer_key:
-                # Use provided answer key if available
-                answers[q] = answer_key[str(q)]
-            else:
-                # Random answer
-                answers[q] = random.choice(option_letters)
+        # Random answer for every question, drawn in one call
+        answers = self.rng.integers(0, options_per_question, size=num_questions).astype(np.int8)
+        
+        # Sometimes skip questions (simulate incomplete answers)
+        skips = self.rng.random(num_questions) < skip_probability
+        
+        # Use provided answer key if available
+        if answer_key:
+            for q_str, letter in answer_key.items():
+                q = int(q_str)
+                if 1 <= q <= num_questions and letter in option_letters:
+                    answers[q - 1] = option_letters.index(letter)
         
+        answers[skips] = -1
         return answers
     
+    def answers_to_dict(self, answers, options_per_question=4):
+        """Convert an answer array to {question number: letter or None} for JSON output"""
+        option_letters = ('A', 'B', 'C', 'D', 'E')[:options_per_question]
+        return {q: option_letters[a] if a >= 0 else None
+                for q, a in enumerate(answers.tolist(), start=1)}
+    
+    def answers_from_dict(self, answer_dict, num_questions=50, options_per_question=4):
+        """Convert {question number: letter or None} to an answer array"""
+        option_letters = ('A', 'B', 'C', 'D', 'E')[:options_per_question]
+        answers = np.full(num_questions, -1, dtype=np.int8)
+        for q_str, letter in answer_dict.items():
+            q = int(q_str)
+            if 1 <= q <= num_questions and letter in option_letters:
+                answers[q - 1] = option_letters.index(letter)
+        return answers
+    
+    def _load_blank(self, blank_sheet_path):
+        """Return a fresh copy of the blank sheet, decoding the file only when it changes"""
+        if not os.path.isfile(blank_sheet_path):
+            return None
+        blank = _decode_blank(blank_sheet_path, os.path.getmtime(blank_sheet_path))
+        return None if blank is None else blank.copy()
+    
     def fill_answers_on_sheet(self, blank_sheet_path, answers, output_path, 
-                             fill_intensity=0.3, add_noise=True):
-        """Fill in the answers on a blank MCQ sheet"""
-        # Load the blank sheet
-        image = cv2.imread(blank_sheet_path)
+                             fill_intensity=0.3, add_noise=True, fast_write=True):
+        """Fill in the answers (int8 option indices, -1 = skipped) on a blank MCQ sheet"""
+        # Load the blank sheet; all drawing happens in place on the BGR buffer
+        image = self._load_blank(blank_sheet_path)
         if image is None:
             print(f"Error: Could not load image from {blank_sheet_path}")
             return None
         
-        # Convert to PIL for easier drawing
-        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(pil_image)
+        # Look up the (cached) template
+        template = self._get_template()
+        centers, radius = template.centers.tolist(), template.radius
+        num_questions, options_per_question = template.centers.shape[:2]
+        
+        # (center_x, center_y, fill_value, radius) of every filled circle
+        marks = []
         
-        # Create template
-        template = self.create_answer_template()
+        # Calculate fill color based on intensity
+        base_fill = max(0, min(255, int(255 * (1 - fill_intensity))))
+        
+        # One pencil-pressure offset per answer, drawn in a single call
+        noise = self.rng.integers(-20, 21, size=len(answers)).tolist()
         
         # Fill in answers
-        for question_num, selected_answer in answers.items():
-            if selected_answer and question_num in template:
-                if selected_answer in template[question_num]:
-                    center_x, center_y = template[question_num][selected_answer]['center']
-                    radius = template[question_num][selected_answer]['radius']
+        for q, (option, fill_noise) in enumerate(zip(answers.tolist(), noise)):
+            if q < num_questions:
+                if 0 <= option < options_per_question:
+                    center_x, center_y = centers[q][option]
                     
-                    # Calculate fill color based on intensity
-                    fill_value = int(255 * (1 - fill_intensity))
-                    fill_color = (fill_value, fill_value, fill_value)
+                    fill_value = base_fill
                     
                     # Add some randomness to simulate pencil marks
                     if add_noise:
-                        noise = random.randint(-20, 20)
-                        fill_value = max(0, min(255, fill_value + noise))
-                        fill_color = (fill_value, fill_value, fill_value)
-                    
-                    # Fill the circle
-                    draw.ellipse([
-                        center_x - radius + 5,  # Slightly smaller than the outline
-                        center_y - radius + 5,
-                        center_x + radius - 5,
-                        center_y + radius - 5
-                    ], fill=fill_color)
+                        fill_value = max(0, min(255, fill_value + fill_noise))
+                    fill_color = self._gray_lut[fill_value]
                     
-                    # Add some imperfection to simulate hand-filled circles
-                    if add_noise:
-                        # Add some random dots for texture
-                        for _ in range(random.randint(5, 15)):
-                            dot_x = center_x + random.randint(-radius//2, radius//2)
-                            dot_y = center_y + random.randint(-radius//2, radius//2)
-                            dot_size = random.randint(1, 3)
-                            darker_fill = max(0, fill_value - random.randint(10, 30))
-                            dot_color = (darker_fill, darker_fill, darker_fill)
-                            draw.ellipse([
-                                dot_x - dot_size, dot_y - dot_size,
-                                dot_x + dot_size, dot_y + dot_size
-                            ], fill=dot_color)
+                    # Fill the circle, slightly smaller than the outline
+                    cv2.circle(image, (center_x, center_y), radius - 5, fill_color, -1, cv2.LINE_AA)
+                    marks.append((center_x, center_y, fill_value, radius))
+        
+        # Add some imperfection to simulate hand-filled circles
+        if add_noise and marks:
+            self.stamp_noise_dots(image, marks)
         
-        # Convert back to OpenCV format and save
-        filled_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-        cv2.imwrite(output_path, filled_image)
+        # Save the BGR buffer as-is, no color conversion needed; fast_write trades
+        # a larger PNG for a much quicker encode
+        params = [cv2.IMWRITE_PNG_COMPRESSION, 1] if fast_write else []
+        cv2.imwrite(output_path, image, params)
         
         print(f"Filled answer sheet saved to: {output_path}")
-        return filled_image
+        return image
+    
+    def stamp_noise_dots(self, arr, marks):
+        """Stamp random darker dots onto each filled circle, in place"""
+        rng = self.rng
+        if _stamp_noise_dots_jit is not None:
+            # Seed the compiled stamper from our generator so --seed stays reproducible
+            _stamp_noise_dots_jit(arr, np.array(marks, dtype=np.int64), int(rng.integers(2**31 - 1)))
+            return
+        
+        for center_x, center_y, fill_value, radius in marks:
+            n = rng.integers(5, 16)
+            dots = rng.integers(-radius // 2, radius // 2 + 1, size=(n, 2)) + (center_x, center_y)
+            sizes = rng.integers(1, 4, size=n)
+            shades = np.clip(fill_value - rng.integers(10, 31, size=n), 0, 255).astype(np.uint8)
+            
+            # Write every dot of the same size with a single fancy-index assignment,
+            # skipping pixels off the sheet like the compiled stamper
+            height, width = arr.shape[:2]
+            for size in np.unique(sizes).tolist():
+                sel = sizes == size
+                dy, dx = self._dot_offsets[size]
+                ys = dots[sel, 1, None] + dy
+                xs = dots[sel, 0, None] + dx
+                inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+                dot_shades = np.broadcast_to(shades[sel, None], ys.shape)
+                arr[ys[inside], xs[inside]] = dot_shades[inside, None]
     
     def create_test_scenarios(self, blank_sheet_path, num_scenarios=5):
         """Create multiple test scenarios with different answer patterns"""
@@ -177,10 +277,7 @@ class MCQAutoFiller:
             
             if scenario.get('pattern'):
                 # Create patterned answers (A-B-C-D repeating)
-                answers = {}
-                options = ['A', 'B', 'C', 'D']
-                for q in range(1, 51):
-                    answers[q] = options[(q-1) % 4]
+                answers = (np.arange(50) % 4).astype(np.int8)
             else:
                 # Generate random answers
                 answers = self.generate_random_answers(
@@ -199,8 +296,7 @@ class MCQAutoFiller:
             
             # Save answer key
             answer_key_path = f"answer_key_{scenario['name']}.json"
-            with open(answer_key_path, 'w') as f:
-                json.dump(answers, f, indent=2)
+            save_json(answer_key_path, self.answers_to_dict(answers))
             
             results[scenario['name']] = {
                 'filled_sheet': output_path,
@@ -210,7 +306,7 @@ class MCQAutoFiller:
             }
             
             # Print summary
-            filled_count = sum(1 for ans in answers.values() if ans is not None)
+            filled_count = int(np.count_nonzero(answers >= 0))
             print(f"  - Questions answered: {filled_count}/50")
             print(f"  - Answer distribution: {self.analyze_answers(answers)}")
         
@@ -218,13 +314,10 @@ class MCQAutoFiller:
     
     def analyze_answers(self, answers):
         """Analyze answer distribution"""
-        distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'E': 0, 'None': 0}
-        
-        for answer in answers.values():
-            if answer is None:
-                distribution['None'] += 1
-            else:
-                distribution[answer] += 1
+        # Shift by one so skipped answers (-1) land in bin 0
+        counts = np.bincount(answers.astype(np.intp) + 1, minlength=6).tolist()
+        distribution = dict(zip(('A', 'B', 'C', 'D', 'E'), counts[1:]))
+        distribution['None'] = counts[0]
         
         return {k: v for k, v in distribution.items() if v > 0}
     
@@ -234,11 +327,7 @@ class MCQAutoFiller:
             with open(answer_key_path, 'r') as f:
                 answer_key = json.load(f)
             
-            # Convert string keys to integers for consistency
-            answers = {}
-            for q_str, answer in answer_key.items():
-                answers[int(q_str)] = answer
-            
+            answers = self.answers_from_dict(answer_key)
             self.fill_answers_on_sheet(blank_sheet_path, answers, output_path)
             print(f"Sheet filled using answer key: {answer_key_path}")
             
@@ -260,10 +349,12 @@ def main():
                        help='Disable noise/texture in filled circles')
     parser.add_argument('--test-scenarios', action='store_true',
                        help='Create multiple test scenarios')
+    parser.add_argument('--seed', type=int, 
+                       help='Random seed for reproducible answers and noise')
     
     args = parser.parse_args()
     
-    filler = MCQAutoFiller()
+    filler = MCQAutoFiller(seed=args.seed)
     
     if args.test_scenarios:
         # Create multiple test scenarios
@@ -295,12 +386,11 @@ def main():
         
         # Save answer key if requested
         if args.save_answers:
-            with open(args.save_answers, 'w') as f:
-                json.dump(answers, f, indent=2)
+            save_json(args.save_answers, filler.answers_to_dict(answers))
             print(f"Answer key saved to: {args.save_answers}")
         
         # Print summary
-        filled_count = sum(1 for ans in answers.values() if ans is not None)
+        filled_count = int(np.count_nonzero(answers >= 0))
         print(f"\nSummary:")
         print(f"  - Questions answered: {filled_count}/50")
         print(f"  - Answer distribution: {filler.analyze_answers(answers)}")
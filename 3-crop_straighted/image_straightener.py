@@ -11,50 +11,50 @@ class ImageStraightener:
             raise ValueError(f"Could not load image from {image_path}")
         self.gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
         self.straightened_image = None
+        self._dst_cache = {}  # Reusable warp output buffers, keyed by (width, height)
         
-    def detect_corner_markers(self) -> List[Tuple[int, int]]:
+    def detect_corner_markers(self, scale: int = 4) -> List[Tuple[int, int]]:
         """Detect the corner markers (black squares) in the image"""
+        height, width = self.gray.shape
+        
+        # Markers are large enough to survive downsampling, so search a smaller image
+        small = cv2.resize(self.gray, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
+        
         # Create a binary image
-        _, binary = cv2.threshold(self.gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
         
         # Find contours
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
-        corners = []
-        for contour in contours:
-            # Filter contours by area and aspect ratio
-            area = cv2.contourArea(contour)
-            if 100 < area < 2000:  # Adjust based on marker size
-                x, y, w, h = cv2.boundingRect(contour)
-                aspect_ratio = w / h
-                
-                # Corner markers should be roughly square and near the corners
-                if 0.7 < aspect_ratio < 1.3:  # Roughly square
-                    # Check if it's near a corner
-                    height, width = self.gray.shape
-                    center_x, center_y = x + w//2, y + h//2
-                    
-                    # Define corner regions (adjust margins as needed)
-                    margin = 100
-                    if ((center_x < margin or center_x > width - margin) and 
-                        (center_y < margin or center_y > height - margin)):
-                        corners.append((center_x, center_y))
-        
-        # Sort corners: top-left, top-right, bottom-right, bottom-left
-        if len(corners) >= 4:
-            corners = sorted(corners)
-            # Sort by y-coordinate to separate top and bottom pairs
-            top_corners = sorted([c for c in corners if c[1] < self.gray.shape[0]//2])
-            bottom_corners = sorted([c for c in corners if c[1] >= self.gray.shape[0]//2])
+        if contours:
+            # Measure every contour up front, then filter them all at once
+            areas = np.array([cv2.contourArea(contour) for contour in contours]) * scale ** 2
+            rects = np.array([cv2.boundingRect(contour) for contour in contours])
+            x, y, w, h = rects.T
+            aspect_ratio = w / h
+            # Map centers back to full-resolution coordinates
+            center_x, center_y = (x + w // 2) * scale, (y + h // 2) * scale
             
-            # Sort each pair by x-coordinate
-            if len(top_corners) >= 2 and len(bottom_corners) >= 2:
-                return [top_corners[0], top_corners[-1], bottom_corners[-1], bottom_corners[0]]
+            # Corner markers should be roughly square and near the corners
+            margin = 100  # Corner region size (adjust as needed)
+            near_corner = (((center_x < margin) | (center_x > width - margin)) &
+                           ((center_y < margin) | (center_y > height - margin)))
+            keep = ((100 < areas) & (areas < 2000) &  # Adjust based on marker size
+                    (0.7 < aspect_ratio) & (aspect_ratio < 1.3) & near_corner)
+            corners = np.stack([center_x, center_y], axis=1)[keep]
+            
+            # Split into top and bottom pairs, each ordered by x (then y)
+            top = corners[corners[:, 1] < height // 2]
+            bottom = corners[corners[:, 1] >= height // 2]
+            if len(top) >= 2 and len(bottom) >= 2:
+                top = top[np.lexsort((top[:, 1], top[:, 0]))].tolist()
+                bottom = bottom[np.lexsort((bottom[:, 1], bottom[:, 0]))].tolist()
+                # Order: top-left, top-right, bottom-right, bottom-left
+                return [tuple(top[0]), tuple(top[-1]), tuple(bottom[-1]), tuple(bottom[0])]
         
         # Fallback: use image corners if markers not detected properly
-        h, w = self.gray.shape
         margin = 50
-        return [(margin, margin), (w-margin, margin), (w-margin, h-margin), (margin, h-margin)]
+        return [(margin, margin), (width-margin, margin), (width-margin, height-margin), (margin, height-margin)]
     
     def crop_and_straighten(self, corners: List[Tuple[int, int]], output_width: int = 800, output_height: int = 1000) -> np.ndarray:
         """Crop and straighten the image based on corner points"""
@@ -67,8 +67,16 @@ class ImageStraightener:
         # Get perspective transform matrix
         matrix = cv2.getPerspectiveTransform(src_points, dst_points)
         
+        # Reuse the output buffer for this size rather than allocating a new one;
+        # the previous result for the same size is overwritten
+        key = (output_width, output_height)
+        if key not in self._dst_cache:
+            self._dst_cache[key] = np.empty((output_height, output_width) + self.image.shape[2:], self.image.dtype)
+        dst = self._dst_cache[key]
+        
         # Apply perspective correction
-        self.straightened_image = cv2.warpPerspective(self.image, matrix, (output_width, output_height))
+        self.straightened_image = cv2.warpPerspective(self.image, matrix, (output_width, output_height), dst=dst,
+                                                      flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
         return self.straightened_image
     
     def save_straightened_image(self, output_path: str):
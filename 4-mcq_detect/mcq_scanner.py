@@ -1,169 +1,445 @@
 import cv2
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator, Optional
 import json
 import argparse
 import os
+import functools
+import time
+from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard json module
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # Optional, falls back to the NumPy row loop
+    njit = None
+
+def cuda_available() -> bool:
+    """Check whether this OpenCV build can run on a CUDA device"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+if njit is not None:
+    @njit(cache=True)
+    def _map_rows_jit(center_x, fill, row_starts, threshold):
+        """Compiled row-to-question mapping: the first filled choice index per question, -1 if none"""
+        picks = np.full(50, -1, np.int8)
+        for row_idx in range(min(len(row_starts) - 1, 25)):
+            start, end = row_starts[row_idx], row_starts[row_idx + 1]
+            if end - start < 4:  # Skip rows with insufficient bubbles
+                continue
+            mean_x = center_x[start:end].mean()
+            
+            # Side 0 is left of the row mean (questions 1-25), side 1 the rest (questions 26-50)
+            for side in range(2):
+                side_count = 0
+                for i in range(start, end):
+                    if (center_x[i] < mean_x) == (side == 0):
+                        side_count += 1
+                if side_count < 4:
+                    continue
+                
+                choice = 0
+                for i in range(start, end):
+                    if (center_x[i] < mean_x) != (side == 0):
+                        continue
+                    if fill[i] > threshold:
+                        picks[row_idx + 25 * side] = choice
+                        break
+                    choice += 1
+                    if choice == 4:
+                        break
+        return picks
+else:
+    _map_rows_jit = None
+
+# Let OpenCV's parallel backend thread the filters within a single scan;
+# batch workers drop back to one thread each (see _init_worker)
+cv2.setUseOptimized(True)
+cv2.setNumThreads(min(4, os.cpu_count() or 1))
+
+CHOICES = np.array(['A', 'B', 'C', 'D'])
+
+def no_answers() -> np.ndarray:
+    """Answers array for 50 questions, all unanswered ('')"""
+    return np.full(50, '', dtype='<U1')
+
+def answers_to_dict(answers: np.ndarray) -> Dict[int, str]:
+    """Convert an answers array to {question number: choice} for answered questions"""
+    answered = np.flatnonzero(answers != '')
+    return dict(zip((answered + 1).tolist(), answers[answered].tolist()))
+
+def read_image_file(image_path: str) -> Optional[np.ndarray]:
+    """Read an image file's raw bytes for cv2.imdecode, or None if it cannot be read"""
+    try:
+        return np.fromfile(image_path, np.uint8)
+    except OSError:
+        return None
+
+def _read_ahead(image_paths: List[str]) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """Yield (path, file bytes), reading the next file in a background thread while the caller works"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = None
+        for image_path in image_paths:
+            future = executor.submit(read_image_file, image_path)
+            if pending is not None:
+                yield pending[0], pending[1].result()
+            pending = (image_path, future)
+        if pending is not None:
+            yield pending[0], pending[1].result()
+
+@functools.lru_cache(maxsize=1)
+def _cuda_filters() -> Tuple["cv2.cuda.Filter", "cv2.cuda.Filter"]:
+    """Build the CUDA blur and local-mean filters once per process; they work on any image size"""
+    blur_filter = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+    mean_filter = cv2.cuda.createBoxFilter(cv2.CV_8UC1, cv2.CV_8UC1, (11, 11),
+                                           borderMode=cv2.BORDER_REPLICATE)
+    return blur_filter, mean_filter
 
 class MCQAnswerSheetScanner:
     def __init__(self):
-        self.answers = {}
+        self.answers = no_answers()  # Choice letter per question, '' if unanswered
         self.bubble_threshold = 0.6  # Threshold for determining if a bubble is filled
+        self.use_cuda = cuda_available()
+        self.cuda_min_pixels = 1_000_000  # GPU upload only pays off on large images
+        self.downsample_min_pixels = 2_000_000  # Threshold larger images at half resolution
+        self._buffers = {}  # Scratch arrays, reused while the image size stays the same
+        self.detection_method = 'contours'  # 'contours' or 'hough'
+        self.reuse_template = False  # Read later sheets at the bubble positions found on the first one
+        self._template = None  # ((image shape, threshold shape), (50, 4, 4) boxes in threshold coordinates)
+        
+    def _buffer(self, name: str, shape: Tuple[int, ...], dtype: type = np.uint8) -> np.ndarray:
+        """Return the named scratch array, reallocating it only when the shape changes"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+        return buffer
+    
+    def preprocess_image(self, image_path: str, image_data: np.ndarray = None) -> np.ndarray:
+        """Load and preprocess the image for better bubble detection.
         
-    def preprocess_image(self, image_path: str) -> np.ndarray:
-        """Load and preprocess the image for better bubble detection"""
-        # Load image
-        img = cv2.imread(image_path)
+        image_data optionally holds the file's bytes, already read (see
+        read_image_file). The returned threshold and grayscale images are views
+        into this scanner's reused scratch buffers and are overwritten by its
+        next call; copy them to keep them across scans.
+        """
+        # Load image, decoding from memory so file I/O can happen ahead of time
+        if image_data is None:
+            image_data = read_image_file(image_path)
+        img = None
+        if image_data is not None and image_data.size:
+            img = cv2.imdecode(image_data, cv2.IMREAD_COLOR)
         if img is None:
             raise ValueError(f"Could not load image from {image_path}")
         
+        if self.use_cuda and img.shape[0] * img.shape[1] >= self.cuda_min_pixels:
+            try:
+                thresh, gray = self._preprocess_cuda(img)
+                return thresh, gray, img
+            except (cv2.error, AttributeError) as e:
+                # Keep scanning on the CPU rather than failing every large image
+                print(f"CUDA preprocessing failed, using the CPU from now on: {e}")
+                self.use_cuda = False
+        
         # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        height, width = img.shape[:2]
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', (height, width)))
+        
+        # Bubbles are large, so high-resolution images can be thresholded at
+        # half size (4x fewer pixels); detect_bubbles maps boxes back up
+        work = gray
+        if gray.size >= self.downsample_min_pixels:
+            small = self._buffer('small', ((height + 1) // 2, (width + 1) // 2))
+            work = cv2.pyrDown(gray, dst=small)
         
         # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(work, (5, 5), 0, dst=self._buffer('blurred', work.shape))
         
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                     cv2.THRESH_BINARY_INV, 11, 2)
+        # Apply adaptive thresholding; the image is already blurred, so a plain
+        # box mean is enough for the local level and much cheaper than a
+        # second Gaussian pass
+        thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_MEAN_C, 
+                                     cv2.THRESH_BINARY_INV, 11, 2, dst=self._buffer('thresh', work.shape))
         
         return thresh, gray, img
     
+    def _preprocess_cuda(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """GPU version of the grayscale/blur/adaptive-threshold steps, uploading once"""
+        gpu_img = cv2.cuda_GpuMat()
+        gpu_img.upload(img)
+        
+        gray = cv2.cuda.cvtColor(gpu_img, cv2.COLOR_BGR2GRAY)
+        blur_filter, mean_filter = _cuda_filters()
+        blurred = blur_filter.apply(gray)
+        
+        # There is no CUDA adaptiveThreshold, so rebuild it: the same 11x11
+        # box local mean, then mark pixels at least C=2 darker than it
+        local_mean = mean_filter.apply(blurred)
+        diff = cv2.cuda.subtract(local_mean.convertTo(cv2.CV_16S), blurred.convertTo(cv2.CV_16S))
+        _, thresh = cv2.cuda.threshold(diff, 1, 255, cv2.THRESH_BINARY)
+        
+        return thresh.convertTo(cv2.CV_8U).download(), gray.download()
+    
     def detect_bubbles(self, thresh_img: np.ndarray, original_img: np.ndarray) -> List[Dict]:
         """Detect circular bubbles in the image"""
-        # Find contours
-        contours, _ = cv2.findContours(thresh_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # The threshold image may be downsampled relative to the original
+        scale = round(original_img.shape[1] / thresh_img.shape[1])
+        
+        # Fill enclosed holes so each bubble outline becomes one solid blob
+        # (like an external contour): flood the background in from a padded
+        # border, and anything left unreached is a hole
+        height, width = thresh_img.shape
+        background = cv2.copyMakeBorder(thresh_img, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+        cv2.floodFill(background, np.zeros((height + 4, width + 4), np.uint8), (0, 0), 255)
+        solid = cv2.bitwise_or(thresh_img, cv2.bitwise_not(background[1:-1, 1:-1]))
+        
+        # Bounding box and area of every blob in one pass (label 0 is the background)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(solid, connectivity=8)
+        _, _, w, h, area = stats[1:].T
+        
+        aspect_ratio = w / h
+        
+        # Filter by area (adjust these values based on your image size; measured
+        # at original resolution), extent (a solid disk covers pi/4 of its
+        # bounding box, while corner-marker pieces cover much less) and
+        # aspect ratio (circles should be roughly square)
+        full_area = area * scale ** 2
+        keep = ((full_area >= 100) & (full_area <= 2000) & (area >= 0.7 * w * h) &
+                (aspect_ratio >= 0.7) & (aspect_ratio <= 1.3))
+        
+        x, y, w, h, area = stats[1:][keep].T
+        fill_ratios = self.box_fill_ratios(thresh_img, x, y, w, h)
+        
+        # Report geometry in original image coordinates
+        x, y, w, h, area = x * scale, y * scale, w * scale, h * scale, area * scale ** 2
         
         bubbles = []
+        for bx, by, bw, bh, barea, fill_ratio in zip(x.tolist(), y.tolist(), w.tolist(), h.tolist(),
+                                                    area.tolist(), fill_ratios.tolist()):
+            bubbles.append({
+                'center': (bx + bw // 2, by + bh // 2),
+                'bbox': (bx, by, bw, bh),
+                'area': barea,
+                'fill_ratio': fill_ratio
+            })
         
-        for contour in contours:
-            # Calculate area and perimeter
-            area = cv2.contourArea(contour)
-            perimeter = cv2.arcLength(contour, True)
-            
-            # Filter by area (adjust these values based on your image size)
-            if area < 100 or area > 2000:
-                continue
-            
-            # Calculate circularity
-            if perimeter == 0:
-                continue
-            circularity = 4 * np.pi * area / (perimeter * perimeter)
-            
-            # Filter by circularity (circles should have circularity close to 1)
-            if circularity < 0.6:
-                continue
-            
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # Check aspect ratio (circles should be roughly square)
-            aspect_ratio = float(w) / h
-            if aspect_ratio < 0.7 or aspect_ratio > 1.3:
-                continue
-            
-            # Calculate center
-            center_x = x + w // 2
-            center_y = y + h // 2
-            
-            # Extract the bubble region for fill detection
-            bubble_region = thresh_img[y:y+h, x:x+w]
-            fill_ratio = np.sum(bubble_region) / (255 * w * h)
-            
+        return bubbles
+    
+    def detect_bubbles_hough(self, thresh_img: np.ndarray, gray_img: np.ndarray,
+                             original_img: np.ndarray) -> List[Dict]:
+        """Detect bubbles as circles in the grayscale image, skipping blob filtering"""
+        # Radii are in original pixels (adjust based on your image size)
+        circles = cv2.HoughCircles(gray_img, cv2.HOUGH_GRADIENT, dp=1, minDist=25,
+                                   param1=50, param2=25, minRadius=8, maxRadius=20)
+        if circles is None:
+            return []
+        
+        # Read fill through a square of half-width 0.9 r around each center, in
+        # threshold image coordinates (which may be downsampled). Its corners
+        # reach past the circle, so it includes some outline and background;
+        # a truly inscribed box (r / sqrt 2) reads fewer sheets correctly at
+        # the shared 0.6 threshold
+        scale = round(original_img.shape[1] / thresh_img.shape[1])
+        height, width = thresh_img.shape
+        center_x, center_y, radius = circles[0].T
+        cx = np.round(center_x / scale).astype(int)
+        cy = np.round(center_y / scale).astype(int)
+        half = np.maximum(np.round(radius * 0.9 / scale).astype(int), 1)
+        x0, y0 = np.clip(cx - half, 0, width - 1), np.clip(cy - half, 0, height - 1)
+        x1, y1 = np.clip(cx + half, x0 + 1, width), np.clip(cy + half, y0 + 1, height)
+        w, h = x1 - x0, y1 - y0
+        fill_ratios = self.box_fill_ratios(thresh_img, x0, y0, w, h)
+        
+        # Report geometry in original image coordinates
+        x, y, w, h = x0 * scale, y0 * scale, w * scale, h * scale
+        area = np.round(np.pi * radius * radius).astype(int)
+        
+        bubbles = []
+        for bx, by, bw, bh, barea, fill_ratio in zip(x.tolist(), y.tolist(), w.tolist(), h.tolist(),
+                                                    area.tolist(), fill_ratios.tolist()):
             bubbles.append({
-                'center': (center_x, center_y),
-                'bbox': (x, y, w, h),
-                'area': area,
-                'fill_ratio': fill_ratio,
-                'contour': contour
+                'center': (bx + bw // 2, by + bh // 2),
+                'bbox': (bx, by, bw, bh),
+                'area': barea,
+                'fill_ratio': fill_ratio
             })
         
         return bubbles
     
-    def organize_bubbles_by_rows(self, bubbles: List[Dict]) -> Dict[int, List[Dict]]:
-        """Organize bubbles into rows based on their y-coordinates"""
-        if not bubbles:
-            return {}
+    def box_fill_ratios(self, thresh_img: np.ndarray, x: np.ndarray, y: np.ndarray,
+                        w: np.ndarray, h: np.ndarray) -> np.ndarray:
+        """Fraction of white pixels in each box"""
+        # Summed-area table: four lookups per box instead of summing each region
+        height, width = thresh_img.shape
+        integral = cv2.integral(thresh_img, sum=self._buffer('integral', (height + 1, width + 1), np.float64),
+                                sdepth=cv2.CV_64F)
+        region_sum = (integral[y + h, x + w] - integral[y, x + w]
+                      - integral[y + h, x] + integral[y, x])
+        return region_sum / (255 * w * h)
+    
+    def organize_bubbles_by_rows(self, bubbles: List[Dict]) -> Dict[str, np.ndarray]:
+        """Organize bubbles into rows based on their y-coordinates.
         
-        # Sort bubbles by y-coordinate
-        bubbles.sort(key=lambda b: b['center'][1])
+        Returns parallel 'center_x', 'center_y', 'fill', 'row_id' and 'bbox'
+        arrays, ordered by row and then by x within each row.
+        """
+        if not bubbles:
+            empty = np.empty(0)
+            return {'center_x': empty, 'center_y': empty, 'fill': empty, 'row_id': np.empty(0, dtype=int),
+                    'bbox': np.empty((0, 4), dtype=int)}
         
-        rows = {}
-        current_row = 0
-        last_y = bubbles[0]['center'][1]
         tolerance = 20  # Pixels tolerance for same row
         
-        for bubble in bubbles:
-            y = bubble['center'][1]
-            
-            # If y-coordinate is significantly different, start new row
-            if abs(y - last_y) > tolerance:
-                current_row += 1
-                last_y = y
-            
-            if current_row not in rows:
-                rows[current_row] = []
-            
-            rows[current_row].append(bubble)
+        centers = np.array([b['center'] for b in bubbles])
+        center_x, center_y = centers[:, 0], centers[:, 1]
+        fill = np.array([b['fill_ratio'] for b in bubbles])
+        bbox = np.array([b['bbox'] for b in bubbles])
+        
+        # Sort bubbles by y-coordinate; a gap of more than the tolerance
+        # between neighbours starts a new row
+        order = np.argsort(center_y, kind='stable')
+        row_ids = np.concatenate(([0], np.cumsum(np.diff(center_y[order]) > tolerance)))
         
         # Sort bubbles in each row by x-coordinate
-        for row in rows.values():
-            row.sort(key=lambda b: b['center'][0])
+        by_row_then_x = np.lexsort((center_x[order], row_ids))
+        order = order[by_row_then_x]
         
-        return rows
+        return {
+            'center_x': center_x[order],
+            'center_y': center_y[order],
+            'fill': fill[order],
+            'row_id': row_ids[by_row_then_x],
+            'bbox': bbox[order]
+        }
     
-    def map_bubbles_to_questions(self, organized_bubbles: Dict[int, List[Dict]]) -> Dict[int, str]:
-        """Map detected bubbles to question numbers and answer choices"""
-        answers = {}
+    def map_bubbles_to_questions(self, organized_bubbles: Dict[str, np.ndarray]) -> np.ndarray:
+        """Map detected bubbles to question numbers and answer choices, as a 50-entry answers array"""
+        answers = no_answers()
         
         # Expected pattern: 50 questions, 4 choices each (A, B, C, D)
         # Questions 1-25 on left side, 26-50 on right side
-        choices = ['A', 'B', 'C', 'D']
         
-        # Sort rows by average y-coordinate
-        sorted_rows = sorted(organized_bubbles.items(), key=lambda x: np.mean([b['center'][1] for b in x[1]]))
+        center_x = organized_bubbles['center_x']
+        fill = organized_bubbles['fill']
+        row_id = organized_bubbles['row_id']
+        if len(row_id) == 0:
+            return answers
         
-        for row_idx, (_, row_bubbles) in enumerate(sorted_rows):
-            if len(row_bubbles) < 4:  # Skip rows with insufficient bubbles
+        # Rows are contiguous y-ranges numbered top to bottom, so row_id is
+        # already the order by average y-coordinate
+        num_rows = int(row_id[-1]) + 1
+        row_starts = np.searchsorted(row_id, np.arange(num_rows + 1))
+        
+        if _map_rows_jit is not None:
+            picks = _map_rows_jit(center_x.astype(np.float64), fill.astype(np.float64), row_starts,
+                                  self.bubble_threshold)
+            answered = picks >= 0
+            answers[answered] = CHOICES[picks[answered]]
+            return answers
+        
+        for row_idx in range(num_rows):
+            row = slice(row_starts[row_idx], row_starts[row_idx + 1])
+            row_x, row_fill = center_x[row], fill[row]
+            if len(row_x) < 4:  # Skip rows with insufficient bubbles
                 continue
             
-            # Determine if this is left side (questions 1-25) or right side (questions 26-50)
-            avg_x = np.mean([b['center'][0] for b in row_bubbles])
+            # Split the (x-sorted) row into left (questions 1-25) and right (questions 26-50) groups
+            left = row_x < row_x.mean()
+            sides = ((row_fill[left], row_idx + 1, 25), (row_fill[~left], row_idx + 26, 50))
             
-            # Split bubbles into left and right groups
-            left_bubbles = [b for b in row_bubbles if b['center'][0] < avg_x]
-            right_bubbles = [b for b in row_bubbles if b['center'][0] >= avg_x]
-            
-            # Process left side (questions 1-25)
-            if len(left_bubbles) >= 4:
-                left_bubbles.sort(key=lambda b: b['center'][0])
-                question_num = row_idx + 1
-                if question_num <= 25:
-                    for i, bubble in enumerate(left_bubbles[:4]):
-                        if bubble['fill_ratio'] > self.bubble_threshold:
-                            answers[question_num] = choices[i]
-                            break
-            
-            # Process right side (questions 26-50)
-            if len(right_bubbles) >= 4:
-                right_bubbles.sort(key=lambda b: b['center'][0])
-                question_num = row_idx + 26
-                if question_num <= 50:
-                    for i, bubble in enumerate(right_bubbles[:4]):
-                        if bubble['fill_ratio'] > self.bubble_threshold:
-                            answers[question_num] = choices[i]
-                            break
+            for side_fill, question_num, last_question in sides:
+                if len(side_fill) >= 4 and question_num <= last_question:
+                    filled = side_fill[:4] > self.bubble_threshold
+                    if filled.any():
+                        answers[question_num - 1] = CHOICES[filled.argmax()]
+        
+        return answers
+    
+    def draw_debug_bubbles(self, original_img: np.ndarray, bubbles: List[Dict]) -> np.ndarray:
+        """Outline filled bubbles in green and the rest in red, labelling only the filled ones"""
+        debug_img = original_img.copy()
+        if not bubbles:
+            return debug_img
+        
+        x, y, w, h = np.array([b['bbox'] for b in bubbles]).T
+        fill = np.array([b['fill_ratio'] for b in bubbles])
+        filled = fill > self.bubble_threshold
+        
+        # Every box as a closed 4-point polyline, drawn in one call per color
+        boxes = np.stack([np.stack([x, y], 1), np.stack([x + w, y], 1),
+                          np.stack([x + w, y + h], 1), np.stack([x, y + h], 1)], axis=1).astype(np.int32)
+        cv2.polylines(debug_img, list(boxes[filled]), True, (0, 255, 0), 2)
+        cv2.polylines(debug_img, list(boxes[~filled]), True, (0, 0, 255), 2)
         
+        for bx, by, fill_ratio in zip(x[filled].tolist(), y[filled].tolist(), fill[filled].tolist()):
+            cv2.putText(debug_img, f"{fill_ratio:.2f}", 
+                      (bx, by-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        return debug_img
+    
+    def calibrate_template(self, organized_bubbles: Dict[str, np.ndarray], original_img: np.ndarray,
+                           thresh_img: np.ndarray) -> bool:
+        """Remember every bubble box if the sheet showed the complete 25-row, 2-column, 4-choice grid"""
+        row_id = organized_bubbles['row_id']
+        if len(row_id) != 25 * 8 or np.any(np.bincount(row_id) != 8):
+            return False
+        
+        # Rows are x-sorted, so each row is four left (questions 1-25) then
+        # four right (questions 26-50) boxes; reorder to question-then-choice
+        scale = round(original_img.shape[1] / thresh_img.shape[1])
+        x, y, w, h = np.moveaxis(organized_bubbles['bbox'] // scale, -1, 0)
+        
+        # Filled bubbles detect with tighter boxes than empty ones, so read every
+        # bubble through one slightly-inset box centered on it
+        box_w, box_h = int(np.median(w) * 0.9), int(np.median(h) * 0.9)
+        boxes = np.stack([x + w // 2 - box_w // 2, y + h // 2 - box_h // 2,
+                          np.full_like(x, box_w), np.full_like(y, box_h)], axis=-1)
+        boxes = boxes.reshape(25, 2, 4, 4).transpose(1, 0, 2, 3).reshape(50, 4, 4)
+        self._template = ((original_img.shape[:2], thresh_img.shape), boxes)
+        return True
+    
+    def read_template_answers(self, thresh_img: np.ndarray) -> np.ndarray:
+        """Read every question straight from the cached bubble boxes, skipping detection"""
+        x, y, w, h = np.moveaxis(self._template[1], -1, 0)
+        fills = self.box_fill_ratios(thresh_img, x, y, w, h)  # (50, 4)
+        
+        # Same rule as map_bubbles_to_questions: first choice above the threshold
+        filled = fills > self.bubble_threshold
+        answered = filled.any(axis=1)
+        answers = no_answers()
+        answers[answered] = CHOICES[filled[answered].argmax(axis=1)]
         return answers
     
-    def scan_answer_sheet(self, image_path: str, debug: bool = False, output_dir: str = ".") -> Dict[int, str]:
-        """Main function to scan the answer sheet and extract answers"""
+    def scan_answer_sheet(self, image_path: str, debug: bool = False, output_dir: str = ".",
+                          image_data: np.ndarray = None) -> np.ndarray:
+        """Main function to scan the answer sheet and extract answers.
+        
+        Returns the choice letter for each of the 50 questions, '' where none was detected.
+        """
         try:
             # Preprocess image
-            thresh_img, gray_img, original_img = self.preprocess_image(image_path)
+            thresh_img, gray_img, original_img = self.preprocess_image(image_path, image_data)
+            
+            # Sheets after the first share its layout, so read them at the
+            # cached positions when the image size matches
+            if (self.reuse_template and self._template is not None and
+                    self._template[0] == (original_img.shape[:2], thresh_img.shape)):
+                if debug:
+                    print("Reading answers at cached template positions")
+                return self.read_template_answers(thresh_img)
             
             # Detect bubbles
-            bubbles = self.detect_bubbles(thresh_img, original_img)
+            if self.detection_method == 'hough':
+                bubbles = self.detect_bubbles_hough(thresh_img, gray_img, original_img)
+            else:
+                bubbles = self.detect_bubbles(thresh_img, original_img)
             
             if debug:
                 print(f"Detected {len(bubbles)} potential bubbles")
@@ -172,22 +448,21 @@ class MCQAnswerSheetScanner:
             organized_bubbles = self.organize_bubbles_by_rows(bubbles)
             
             if debug:
-                print(f"Organized into {len(organized_bubbles)} rows")
-                for row_idx, row_bubbles in organized_bubbles.items():
-                    print(f"Row {row_idx}: {len(row_bubbles)} bubbles")
+                row_counts = np.bincount(organized_bubbles['row_id'])
+                print(f"Organized into {len(row_counts)} rows")
+                for row_idx, row_count in enumerate(row_counts.tolist()):
+                    print(f"Row {row_idx}: {row_count} bubbles")
             
             # Map bubbles to questions and answers
             answers = self.map_bubbles_to_questions(organized_bubbles)
             
+            if self.reuse_template and self.calibrate_template(organized_bubbles, original_img, thresh_img):
+                if debug:
+                    print("Cached bubble template for later sheets")
+            
             if debug:
                 # Create debug image showing detected bubbles
-                debug_img = original_img.copy()
-                for bubble in bubbles:
-                    x, y, w, h = bubble['bbox']
-                    color = (0, 255, 0) if bubble['fill_ratio'] > self.bubble_threshold else (0, 0, 255)
-                    cv2.rectangle(debug_img, (x, y), (x+w, y+h), color, 2)
-                    cv2.putText(debug_img, f"{bubble['fill_ratio']:.2f}", 
-                              (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+                debug_img = self.draw_debug_bubbles(original_img, bubbles)
                 
                 # Save debug image to output directory
                 debug_output_path = os.path.join(output_dir, 'debug_bubbles.jpg')
@@ -198,43 +473,135 @@ class MCQAnswerSheetScanner:
             
         except Exception as e:
             print(f"Error scanning answer sheet: {str(e)}")
-            return {}
+            return no_answers()
     
-    def save_results(self, answers: Dict[int, str], output_dir: str = ".", output_filename: str = "scanned_answers.json"):
+    def save_results(self, answers: np.ndarray, output_dir: str = ".", output_filename: str = "scanned_answers.json"):
         """Save the scanned answers to a JSON file in the specified directory"""
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
         # Create full output path
         output_path = os.path.join(output_dir, output_filename)
+        answers = answers_to_dict(answers)
         
-        with open(output_path, 'w') as f:
-            json.dump(answers, f, indent=2)
+        if orjson is not None:
+            # Question numbers are int keys, which orjson only accepts with OPT_NON_STR_KEYS
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(answers, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w') as f:
+                json.dump(answers, f, indent=2)
         print(f"Results saved to {output_path}")
     
-    def print_results(self, answers: Dict[int, str]):
+    def print_results(self, answers: np.ndarray):
         """Print the scanned answers in a readable format"""
         print("\n=== SCANNED ANSWERS ===")
-        for question in range(1, 51):
-            answer = answers.get(question, "No answer detected")
-            print(f"Question {question:2d}: {answer}")
+        for question, answer in enumerate(answers.tolist(), 1):
+            print(f"Question {question:2d}: {answer or 'No answer detected'}")
         
-        print(f"\nTotal answered questions: {len(answers)}/50")
+        print(f"\nTotal answered questions: {np.count_nonzero(answers != '')}/50")
+
+_worker_scanner = None  # One scanner per worker process, so cached state carries across its sheets
+
+def _init_worker(threshold: float = 0.6, reuse_template: bool = False, detection_method: str = 'contours'):
+    """Keep OpenCV single-threaded inside each worker to avoid oversubscribing cores"""
+    global _worker_scanner
+    cv2.setNumThreads(1)
+    _worker_scanner = MCQAnswerSheetScanner()
+    _worker_scanner.bubble_threshold = threshold
+    _worker_scanner.reuse_template = reuse_template
+    _worker_scanner.detection_method = detection_method
+
+def _scan_chunk(image_paths: List[str]) -> List[Tuple[str, np.ndarray]]:
+    """Scan a few sheets in a worker process, reading each next file while the current one is scanned"""
+    return [(image_path, _worker_scanner.scan_answer_sheet(image_path, image_data=image_data))
+            for image_path, image_data in _read_ahead(image_paths)]
+
+def scan_batch(image_paths: List[str], workers: int = None, threshold: float = 0.6,
+               reuse_template: bool = False, detection_method: str = 'contours') -> Dict[str, np.ndarray]:
+    """Scan many independent answer sheets in parallel, one process per core by default"""
+    if not image_paths:
+        return {}
+    workers = workers or os.cpu_count()
+    
+    # Chunks of up to four sheets, smaller when that leaves cores idle, and
+    # never more processes than chunks
+    chunk_size = max(1, min(4, -(-len(image_paths) // workers)))
+    chunks = [image_paths[i:i + chunk_size] for i in range(0, len(image_paths), chunk_size)]
+    workers = min(workers, len(chunks))
+    
+    with Pool(workers, initializer=_init_worker, initargs=(threshold, reuse_template, detection_method)) as pool:
+        results = {}
+        for chunk_results in pool.imap_unordered(_scan_chunk, chunks):
+            results.update(chunk_results)
+        return results
+
+def benchmark_threads(image_path: str, repeats: int = 10):
+    """Time preprocessing and detection at one OpenCV thread and at the default count, to check threading helps on this host"""
+    default_threads = cv2.getNumThreads()
+    scanner = MCQAnswerSheetScanner()
+    image_data = read_image_file(image_path)
+    print(f"OpenCV optimized: {cv2.useOptimized()}, default threads: {default_threads}")
+    
+    try:
+        for num_threads in sorted({1, default_threads}):
+            cv2.setNumThreads(num_threads)
+            for run in range(repeats + 1):
+                if run == 1:  # The first run only warms up buffers and caches
+                    start = time.perf_counter()
+                thresh_img, _, original_img = scanner.preprocess_image(image_path, image_data)
+                scanner.detect_bubbles(thresh_img, original_img)
+            elapsed = (time.perf_counter() - start) / repeats
+            print(f"{num_threads} thread(s): {elapsed * 1000:.1f} ms per image")
+    finally:
+        cv2.setNumThreads(default_threads)
 
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='MCQ Answer Sheet Scanner')
-    parser.add_argument('image_path', help='Path to the answer sheet image')
+    parser.add_argument('image_paths', nargs='+', metavar='image_path',
+                       help='Path to the answer sheet image (several paths are scanned in parallel)')
     parser.add_argument('-o', '--output-dir', default='.', 
                        help='Output directory for results (default: current directory)')
-    parser.add_argument('-f', '--output-file', default='scanned_answers.json',
-                       help='Output filename for JSON results (default: scanned_answers.json)')
+    parser.add_argument('-f', '--output-file', default=None,
+                       help='Output filename for JSON results (default: scanned_answers.json; '
+                            'single image only, batch results are named after each image)')
     parser.add_argument('-d', '--debug', action='store_true',
-                       help='Enable debug mode (saves debug image)')
+                       help='Enable debug mode (saves debug image; single image only)')
     parser.add_argument('-t', '--threshold', type=float, default=0.6,
                        help='Bubble fill threshold (0.0-1.0, default: 0.6)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                       help='Worker processes for batch scans (default: CPU count)')
+    parser.add_argument('-m', '--method', choices=['contours', 'hough'], default='contours',
+                       help='Bubble detection method (default: contours)')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Time single- vs multi-threaded OpenCV on the first image instead of scanning')
+    parser.add_argument('--reuse-template', action='store_true',
+                       help='Read later sheets at the bubble positions found on the first (sheets must share one layout)')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if len(args.image_paths) > 1 and not args.benchmark:
+        if args.output_file is not None:
+            parser.error("-f/--output-file only applies to a single image")
+        if args.debug:
+            parser.error("-d/--debug only applies to a single image")
+    if args.output_file is None:
+        args.output_file = 'scanned_answers.json'
+    return args
+
+def batch_output_names(image_paths: List[str]) -> List[str]:
+    """JSON file name for each image, named after it, with _2, _3, ... added when names repeat"""
+    used = set()
+    names = []
+    for image_path in image_paths:
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        name, index = stem + '.json', 1
+        while name in used:
+            index += 1
+            name = f"{stem}_{index}.json"
+        used.add(name)
+        names.append(name)
+    return names
 
 # Usage example
 if __name__ == "__main__":
@@ -246,19 +613,32 @@ if __name__ == "__main__":
     
     # Set bubble threshold if provided
     scanner.bubble_threshold = args.threshold
+    scanner.reuse_template = args.reuse_template
+    scanner.detection_method = args.method
     
     try:
-        # Scan the answer sheet
-        answers = scanner.scan_answer_sheet(args.image_path, debug=args.debug, output_dir=args.output_dir)
-        
-        # Print results
-        scanner.print_results(answers)
-        
-        # Save results to JSON file in specified directory
-        scanner.save_results(answers, args.output_dir, args.output_file)
+        if args.benchmark:
+            benchmark_threads(args.image_paths[0])
+        elif len(args.image_paths) > 1:
+            # Scan all sheets in parallel; each result is named after its image
+            results = scan_batch(args.image_paths, workers=args.workers, threshold=args.threshold,
+                                 reuse_template=args.reuse_template, detection_method=args.method)
+            for image_path, output_file in zip(args.image_paths, batch_output_names(args.image_paths)):
+                answers = results[image_path]
+                print(f"{image_path}: {np.count_nonzero(answers != '')}/50 answered")
+                scanner.save_results(answers, args.output_dir, output_file)
+        else:
+            # Scan the answer sheet
+            answers = scanner.scan_answer_sheet(args.image_paths[0], debug=args.debug, output_dir=args.output_dir)
+            
+            # Print results
+            scanner.print_results(answers)
+            
+            # Save results to JSON file in specified directory
+            scanner.save_results(answers, args.output_dir, args.output_file)
         
     except FileNotFoundError:
-        print(f"Error: Could not find image file '{args.image_path}'")
+        print(f"Error: Could not find image file '{args.image_paths[0]}'")
         print("Please make sure the image file exists and provide the correct path")
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1,9 +1,53 @@
 import json
 import csv
+import io
 import os
 import sys
 import argparse
 
+try:
+    import orjson  # Optional, much faster JSON parsing
+except ImportError:
+    orjson = None
+
+NUM_QUESTIONS = 50
+QUESTION_KEYS = [str(i) for i in range(1, NUM_QUESTIONS + 1)]  # JSON keys, in question order
+HEADERS = [f'Q{i}' for i in range(1, NUM_QUESTIONS + 1)]
+
+def load_answers(json_file):
+    """Read a scanned answers JSON file into a dict"""
+    with open(json_file, 'rb') as f:
+        data = f.read()
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def order_answers(answers_dict):
+    """Create ordered list of answers from 1 to 50, using 'NA' if question not found"""
+    return [answers_dict.get(key, 'NA') for key in QUESTION_KEYS]
+
+def format_row(row):
+    """Encode one CSV line exactly as csv.writer would, skipping it for plain answers"""
+    try:
+        line = ','.join(row)
+    except TypeError:  # Non-string values from a hand-edited JSON file
+        line = None
+    if line is None or line.count(',') != len(row) - 1 or '"' in line or '\n' in line or '\r' in line:
+        # Values that need quoting go through the csv module
+        buffer = io.StringIO(newline='')
+        csv.writer(buffer).writerow(row)
+        return buffer.getvalue().encode('utf-8')
+    return (line + '\r\n').encode('utf-8')
+
+def append_rows(csv_file, rows):
+    """Append answer rows to the CSV, writing headers first if it is new or empty; returns True if created"""
+    new_file = not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+    lines = [format_row(row) for row in rows]
+    if new_file:
+        lines.insert(0, format_row(HEADERS))
+    with open(csv_file, 'ab') as f:  # 'a' for append mode; every line in one write
+        f.write(b''.join(lines))
+    return new_file
+
 def export_answers_to_csv(json_file='my_answers.json', csv_file='answers.csv'):
     """
     Read answers from JSON file and export to CSV.
@@ -12,8 +56,7 @@ def export_answers_to_csv(json_file='my_answers.json', csv_file='answers.csv'):
     
     # Read the JSON file
     try:
-        with open(json_file, 'r') as f:
-            answers_dict = json.load(f)
+        answers_dict = load_answers(json_file)
     except FileNotFoundError:
         print(f"Error: {json_file} not found!")
         return
@@ -21,32 +64,17 @@ def export_answers_to_csv(json_file='my_answers.json', csv_file='answers.csv'):
         print(f"Error: Invalid JSON format in {json_file}")
         return
     
-    # Create ordered list of answers from 1 to 50
-    ordered_answers = []
-    for i in range(1, 51):
-        answer = answers_dict.get(str(i), 'NA')  # Use 'NA' if question not found
-        ordered_answers.append(answer)
-    
-    # Check if CSV file exists
-    file_exists = os.path.exists(csv_file)
+    ordered_answers = order_answers(answers_dict)
+    unanswered = ordered_answers.count('NA')
     
     # Write to CSV
     try:
-        with open(csv_file, 'a', newline='') as f:  # 'a' for append mode
-            writer = csv.writer(f)
-            
-            # If file doesn't exist or is empty, write headers
-            if not file_exists or os.path.getsize(csv_file) == 0:
-                headers = [f'Q{i}' for i in range(1, 51)]
-                writer.writerow(headers)
-                print(f"Created new CSV file: {csv_file}")
-            else:
-                print(f"Adding new row to existing CSV: {csv_file}")
-            
-            # Write the answers row
-            writer.writerow(ordered_answers)
-            print("Answers exported successfully!")
-            
+        if append_rows(csv_file, [ordered_answers]):
+            print(f"Created new CSV file: {csv_file}")
+        else:
+            print(f"Adding new row to existing CSV: {csv_file}")
+        print("Answers exported successfully!")
+        
     except Exception as e:
         print(f"Error writing to CSV: {e}")
         return
@@ -54,19 +82,46 @@ def export_answers_to_csv(json_file='my_answers.json', csv_file='answers.csv'):
     # Display summary
     print(f"\nSummary:")
     print(f"- Total questions processed: 50")
-    print(f"- Questions with answers: {len([a for a in ordered_answers if a != 'NA'])}")
-    print(f"- Questions without answers: {len([a for a in ordered_answers if a == 'NA'])}")
+    print(f"- Questions with answers: {NUM_QUESTIONS - unanswered}")
+    print(f"- Questions without answers: {unanswered}")
     
     # Show missing questions if any
-    missing_questions = [i for i in range(1, 51) if str(i) not in answers_dict]
+    missing_questions = sorted(map(int, set(QUESTION_KEYS) - answers_dict.keys()))
     if missing_questions:
         print(f"- Missing question numbers: {missing_questions}")
 
+def export_many(json_files, csv_file='answers.csv'):
+    """
+    Export many JSON answer files to CSV, one row each, in a single write.
+    Unreadable files are reported and skipped.
+    """
+    rows = []
+    for json_file in json_files:
+        try:
+            rows.append(order_answers(load_answers(json_file)))
+        except FileNotFoundError:
+            print(f"Error: {json_file} not found!")
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON format in {json_file}")
+    
+    if not rows:
+        print("No answers to export.")
+        return
+    
+    try:
+        created = append_rows(csv_file, rows)
+    except Exception as e:
+        print(f"Error writing to CSV: {e}")
+        return
+    
+    action = "Created new CSV file" if created else "Added rows to existing CSV"
+    print(f"{action}: {csv_file} ({len(rows)}/{len(json_files)} files exported)")
+
 def main():
     # Method 1: Command line arguments with argparse
     parser = argparse.ArgumentParser(description='Export JSON answers to CSV')
-    parser.add_argument('-i', '--input', default='my_answers.json', 
-                       help='Input JSON file (default: my_answers.json)')
+    parser.add_argument('-i', '--input', nargs='+', default=['my_answers.json'], 
+                       help='Input JSON file(s) or a directory of them (default: my_answers.json)')
     parser.add_argument('-o', '--output', default='answers.csv',
                        help='Output CSV file (default: answers.csv)')
     
@@ -85,12 +140,24 @@ def main():
         json_file = args.input
         csv_file = args.output
     
+    # Several inputs (or a directory) are exported together in one write
+    if isinstance(json_file, list):
+        if len(json_file) == 1 and os.path.isdir(json_file[0]):
+            json_dir = json_file[0]
+            json_file = [os.path.join(json_dir, name) for name in sorted(os.listdir(json_dir))
+                         if name.endswith('.json')]
+        elif len(json_file) == 1:
+            json_file = json_file[0]
+    
     print(f"Input file: {json_file}")
     print(f"Output file: {csv_file}")
     print("-" * 40)
     
     # Run the export function
-    export_answers_to_csv(json_file, csv_file)
+    if isinstance(json_file, list):
+        export_many(json_file, csv_file)
+    else:
+        export_answers_to_csv(json_file, csv_file)
     
     # Optional: Display the CSV content for verification
     try: